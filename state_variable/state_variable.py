@@ -1,5 +1,8 @@
 """General simple state variable module."""
-from copy import deepcopy
+# Perf notes:  there is no numeric/array work here -- the cost of state() is Python dispatch, i.e. dict
+# manipulation, attribute access and copying.  So speedups come from skipping work (immutables aren't
+# copied, plain state/value calls skip mset, the class dir() and parsed files are cached) rather than from
+# vectorizing anything.
 from . import sv_util
 from . import state_variable_meta
 from .state_variable_error import StateVariableError
@@ -83,10 +86,15 @@ class StateVariable:
         self.meta = state_variable_meta.Metastate()  # Make instance, but only defaults (ie don't include kwargs here)
         # Make sure they all start with 'meta_'
         kwmeta = self.meta.metalize(kwargs)
+        cls = type(self)
+        if '_base_attr' not in cls.__dict__:  # The class attributes are constant per class, so only introspect once
+            cls._base_attr = frozenset(dir(cls))
+        # Same as dir(self):  the class attributes plus the instance ones (meta, or any set by a subclass beforehand)
+        base_attr = sorted(cls._base_attr.union(self.__dict__))
         if 'meta_attr' in kwmeta:  # Collect attributes to avoid overwriting
-            kwmeta['meta_attr'] += dir(self)
+            kwmeta['meta_attr'] += base_attr
         else:
-            kwmeta['meta_attr'] = dir(self)
+            kwmeta['meta_attr'] = base_attr
         self.state(**kwmeta)  # Include them here to get checked by state
 
     def state(self, **kwargs):
@@ -138,20 +146,32 @@ class StateVariable:
         if not len(kwargs):
             self.meta.mlist(show_full=False)  # Just show values and return
             return
-        kwmeta = {'state': {}}
+        kwstate = {}
+        kwmeta = {}
+        maybe_copy = sv_util._maybe_copy_
+        only_plain = True  # i.e. just state/value pairs
         for k, v in kwargs.items():
-            if k.startswith('state_'):
-                kwmeta['state'].setdefault(kwargs['state_name'], {})
-                kwmeta['state'][kwargs['state_name']][k] = deepcopy(v)
+            if k[:6] == 'state_':
+                kwstate.setdefault(kwargs['state_name'], {})[k] = v
+                only_plain = False
             elif k == 'meta_state':
-                kwmeta['state'].update(sv_util._dict_from_input_(v))
-            elif k.startswith('meta_'):
-                kwmeta[k[5:]] = deepcopy(v)  # Strip off the 'meta_'
+                kwstate.update(sv_util._dict_from_input_(v))
+                only_plain = False
+            elif k[:5] == 'meta_':
+                kwmeta[k[5:]] = maybe_copy(v)  # Strip off the 'meta_'
+                only_plain = False
             else:
-                kwmeta['state'][k] = {'state_name': k, 'state_value': deepcopy(v)}
-        self.meta.mset(**kwmeta)  # Update the meta_data
+                kwstate[k] = {'state_name': k, 'state_value': v}
+        meta = self.meta
+        if only_plain:  # No metastate changes, so skip mset and just update the states
+            meta._update_meta_state_parameter(kwstate)
+            meta.override = False
+        else:
+            if kwstate:  # Only pass along a state update if there is one
+                kwmeta['state'] = kwstate
+            meta.mset_dict(kwmeta)  # Update the meta_data
         # Copy state parameters to attributes
-        for k, val in self.meta.state.items():
+        for k, val in meta.state.items():
             setattr(self, k, val['state_value'])
 
     def reset(self, override_yn=None):
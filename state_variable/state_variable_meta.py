@@ -1,9 +1,10 @@
 """General simple state variable module."""
-from copy import copy, deepcopy
-from tabulate import tabulate
+from types import MappingProxyType
 from . import sv_util
 from .state_variable_error import StateVariableError
 
+_NOT_SET = object()  # mset marker for a metastate attribute that is missing (can't equal any user value)
+
 
 class Metastate:
     parameters = {
@@ -19,7 +20,39 @@ class Metastate:
         'package': {'type': (str, dict), 'choices': None, 'default': 'default'},
         'override': {'type': (bool), 'choices': None, 'default': False}
         }
-    state_key_defaults = {'state_name': None, 'state_value': None, 'state_type': 'auto', 'state_description': None}
+    # Handled separately from the other parameters in mset
+    mset_skip = frozenset({'package', 'verbose', 'state'})
+    # Initial instance attributes, set in one go in __init__ (state/attr then get their own new dict/list)
+    default_attributes = {k: v['default'] for k, v in parameters.items()}
+    # Set versions of the choices for membership checks (the lists are kept for ordering/messages)
+    choices_set = {k: frozenset(v['choices']) for k, v in parameters.items() if v['choices'] is not None}
+    # How _process_meta_kwargs_ handles a parameter -- any not listed are checked against their type/choices.
+    meta_kwarg_handling = {'verbose': 'bool', 'enforce_set': 'bool', 'enforce_type': 'bool',
+                           'notify_set': 'notify', 'notify_type': 'notify', 'state': 'state'}
+    # Read-only, and values must stay immutable, since new state entries share them without copying
+    state_key_defaults = MappingProxyType({'state_name': None, 'state_value': None, 'state_type': 'auto',
+                                           'state_description': None})
+    # default, minimal, middle, maximal, init -- built once here, each instance gets a copy in _make_defined_packages_
+    base_defined_pkg = {
+        'default': {'package': 'default',
+                    'verbose': parameters['verbose']['default'],
+                    'enforce_set': parameters['enforce_set']['default'],
+                    'enforce_type': parameters['enforce_type']['default'],
+                    'notify_set': parameters['notify_set']['default'],
+                    'notify_type': parameters['notify_type']['default']},
+        'minimal': {'package': 'minimal', 'verbose': False,
+                    'enforce_set': False, 'enforce_type': False,
+                    'notify_set': 'ignore', 'notify_type': 'ignore'},
+        'middle': {'package': 'middle', 'verbose': True,
+                   'enforce_set': True, 'enforce_type': False,
+                   'notify_set': 'alert', 'notify_type': 'alert'},
+        'maximal': {'package': 'maximal', 'verbose': True,
+                    'enforce_set': True, 'enforce_type': True,
+                    'notify_set': 'error', 'notify_type': 'error'},
+        'init': {'package': 'init',
+                 'enforce_set': False, 'enforce_type': False,
+                 'notify_set': 'ignore', 'notify_type': 'ignore'}
+        }
 
     def __init__(self, **kwargs):
         """
@@ -39,9 +72,10 @@ class Metastate:
 
         """
         self._make_defined_packages_()
-        for k, v in self.parameters.items():
-            setattr(self, k, copy(v['default']))
-        self.mset(**kwargs)
+        self.__dict__.update(self.default_attributes)
+        self.state = {}  # The mutable ones need their own
+        self.attr = []
+        self.mset_dict(kwargs)
 
     def metalize(self, kwargs):
         """
@@ -53,39 +87,20 @@ class Metastate:
         I'm hoping to make this easier/better by doing this, but we'll see.
         """
         metalize = {}
+        parameters = self.parameters
         for key, val in kwargs.items():
-            if key.startswith('meta_'):
-                if key[5:] in self.parameters:
-                    metalize[key] = val
-                else:
-                    raise ValueError(f"{key} not a valid metastate parameter.")
-            else:
-                if key in self.parameters:
-                    metalize[f"meta_{key}"] = val
-                else:
-                    raise ValueError(f"{key} not a valid metastate parameter.")
+            stripped = key[5:] if key[:5] == 'meta_' else key
+            if stripped not in parameters:
+                raise ValueError(f"{key} not a valid metastate parameter.")
+            metalize['meta_' + stripped] = val
         return metalize
 
     def _svm_alert_(self, msg):
         return f"ALERT:MSV[{self.label}]: {msg}"
 
     def _make_defined_packages_(self):
-        # default, minimal, middle, maximal, reset, init
-        self.defined_pkg = {'default': {'package': 'default'}}
-        for k in ['verbose', 'enforce_set', 'enforce_type', 'notify_set', 'notify_type']:
-            self.defined_pkg['default'][k] = self.parameters[k]['default']
-        self.defined_pkg['minimal'] = {'package': 'minimal', 'verbose': False,
-                                       'enforce_set': False, 'enforce_type': False,
-                                       'notify_set': 'ignore', 'notify_type': 'ignore'}
-        self.defined_pkg['middle'] = {'package': 'middle', 'verbose': True,
-                                      'enforce_set': True, 'enforce_type': False,
-                                      'notify_set': 'alert', 'notify_type': 'alert'}
-        self.defined_pkg['maximal'] = {'package': 'maximal', 'verbose': True,
-                                       'enforce_set': True, 'enforce_type': True,
-                                       'notify_set': 'error', 'notify_type': 'error'}
-        self.defined_pkg['init'] = {'package': 'init',
-                                    'enforce_set': False, 'enforce_type': False,
-                                    'notify_set': 'ignore', 'notify_type': 'ignore'}
+        # Per-instance copy, since user packages get added to it (all values are str/bool, so shallow is fine)
+        self.defined_pkg = {k: dict(v) for k, v in self.base_defined_pkg.items()}
 
     def apply_package(self, package):
         """
@@ -108,28 +123,30 @@ class Metastate:
             The return dict has keys that correspond to the metastate parameters.
 
         """
-        this_package = {}
-        if package in ['none', 'None', None]:
+        if package is None or (isinstance(package, str) and package.lower() == 'none'):
             return {}
         if isinstance(package, dict):
-            if 'package' not in package or package['package'] is None:
-                package['package'] = 'user'
-            self.defined_pkg[package['package']] = deepcopy(package)
-            this_package = package
-        elif package.endswith('.json') or package.endswith('.yaml') or package.endswith('.yml'):
-            this_package = {'package': package}
-            this_package.update(sv_util._dict_from_input_(package))
+            this_package = self._cull_package_(package)
+            if this_package.get('package') is None:
+                this_package['package'] = 'user'
+            self.defined_pkg[this_package['package']] = this_package
+        elif package.endswith(sv_util.FILE_SUFFIXES):
+            this_package = self._cull_package_({'package': package, **sv_util._dict_from_input_(package)})
         elif package in self.defined_pkg:
-            this_package = self.defined_pkg[package]
-        cull_package = list(this_package.keys())
-        for this_key in cull_package:
-            if this_key not in self.parameters:
-                if self.verbose:
-                    print(f"Warning: {this_key} is not a valid metastate parameter.")
-                del this_package[this_key]
-        if len(this_package) == 1 and list(this_package.keys())[0] == 'package':
+            this_package = self.defined_pkg[package]  # Was culled when it was defined
+        else:
             return {}
-        return deepcopy(this_package)
+        if len(this_package) == 1 and 'package' in this_package:
+            return {}
+        return sv_util._maybe_copy_(this_package)  # Values nearly always just str/bool, so cheap
+
+    def _cull_package_(self, package):
+        """Return a copy of package with only valid metastate parameters."""
+        if self.verbose:
+            for this_key in package:
+                if this_key not in self.parameters:
+                    print(f"Warning: {this_key} is not a valid metastate parameter.")
+        return {k: sv_util._maybe_copy_(v) for k, v in package.items() if k in self.parameters}
 
     def _process_meta_kwargs_(self, this_key, this_val):
         """
@@ -146,26 +163,29 @@ class Metastate:
         
         Returns
         -------
-        The value derived for that metastate parameter -- it IS one of the metastate parameter types or INVALID|.
+        The value derived for that metastate parameter -- it IS one of the metastate parameter types or sv_util.Invalid.
         """
-        if this_key not in self.parameters:
-            return f"{sv_util.INVALID}|{this_key}"
-        if this_key == 'state':
+        parameter = self.parameters.get(this_key)
+        if parameter is None:
+            return sv_util.Invalid(this_key)
+        handling = self.meta_kwarg_handling.get(this_key)
+        if handling == 'bool':
+            return sv_util._bool_from_input_(this_val)
+        if handling == 'notify':
+            lower_val = this_val.lower()
+            if lower_val in self.choices_set[this_key]:
+                return lower_val
+            print(f"Invalid {this_key} choice [{this_val}] - must be one of {parameter['choices']}")
+            print(f"Returning {parameter['choices'][-1]}")
+            return parameter['choices'][-1]
+        if handling == 'state':
             print("Hmmm, you shouldn't be here...")
             return
-        if this_key.startswith('enforce') or this_key == 'verbose':
-            return sv_util._bool_from_input_(this_val)
-        if this_key.startswith('notify'):
-            if this_val.lower() in self.parameters[this_key]['choices']:
-                return this_val.lower()
-            print(f"Invalid {this_key} choice [{this_val}] - must be one of {self.parameters[this_key]['choices']}")
-            print(f"Returning {self.parameters[this_key]['choices'][-1]}")
-            return copy(self.parameters[this_key]['choices'][-1])
-        if self.parameters[this_key]['choices'] is None and isinstance(this_val, self.parameters[this_key]['type']):
+        if parameter['choices'] is None and isinstance(this_val, parameter['type']):
             return this_val
-        elif isinstance(self.parameters[this_key]['choices'], list) and this_val in self.parameters[this_key]['choices']:
+        elif this_key in self.choices_set and this_val in self.choices_set[this_key]:
             return this_val
-        return f"{sv_util.INVALID}|{this_key}={this_val}"
+        return sv_util.Invalid(f"{this_key}={this_val}")
 
     def _state_complies(self, update_state):
         """
@@ -176,8 +196,14 @@ class Metastate:
         # 'notify_type': {'type': (str), 'choices': ['ignore', 'alert', 'error'], 'default': 'ignore'},
 
         """
+        if not self.enforce_type and not self.enforce_set and self.notify_type == 'ignore' and self.notify_set == 'ignore':
+            return True  # Nothing would be enforced or reported, so skip the checks
         entry_complies = True
-        if isinstance(update_state['state_type'], type) and type(update_state['state_value']) != update_state['state_type']:
+        state_type = update_state['state_type']
+        state_value = update_state['state_value']
+        # isinstance lets subclasses through, except that a bool is not accepted for a non-bool type (e.g. int)
+        if isinstance(state_type, type) and (not isinstance(state_value, state_type) or
+                                             (type(state_value) is bool and state_type is not bool)):
             msg = f"incorrect type for {update_state['state_name']}: {type(update_state['state_value'])} should be {update_state['state_type']}"
             preamble = 'Setting value although'
             if self.enforce_type:
@@ -214,26 +240,24 @@ class Metastate:
         states2update : something handleable by sv_utils._dict_from_input_
 
         """
+        state = self.state
+        state_complies = self._state_complies
+        state_key_defaults = self.state_key_defaults
+        maybe_copy = sv_util._maybe_copy_
         for sv_name, sv_val in sv_util._dict_from_input_(meta_state).items():
-            if sv_name in self.state:
-                update_state = deepcopy(self.state[sv_name])
-            else:
-                update_state = {}  # Make new with defaults.
-                for k, v in self.state_key_defaults.items():
-                    update_state[k] = deepcopy(v)
+            # Start from the current entry or the defaults -- state_value always gets replaced, so shallow is fine
+            current_state = state.get(sv_name, state_key_defaults)
             if isinstance(sv_val, dict) and 'state_value' in sv_val:
-                if 'state_name' in sv_val:
-                    if sv_val['state_name'] != sv_name:
-                        print(f"{sv_name} != {sv_val['state_name']} -> using {sv_val['state_name']}")
-                else:
-                    sv_val['state_name'] = sv_name
-                update_state.update(sv_val)
+                if 'state_name' in sv_val and sv_val['state_name'] != sv_name:
+                    print(f"{sv_name} != {sv_val['state_name']} -> using {sv_val['state_name']}")
+                update_state = {**current_state, 'state_name': sv_name, **sv_val}
             else:
-                update_state.update({'state_name': sv_name, 'state_value': sv_val})
+                update_state = {**current_state, 'state_name': sv_name, 'state_value': sv_val}
             if update_state['state_type'] == 'auto':
                 update_state['state_type'] = type(update_state['state_value'])
-            if self._state_complies(update_state):
-                self.state[update_state['state_name']] = deepcopy(update_state)
+            if state_complies(update_state):
+                update_state['state_value'] = maybe_copy(update_state['state_value'])
+                state[update_state['state_name']] = update_state
     
     def mset(self, **kwargs):
         """
@@ -255,32 +279,47 @@ class Metastate:
         sets the appropriate self.metastate attributes
 
         """
+        self.mset_dict(kwargs)
+
+    def mset_dict(self, metaset):
+        """
+        Same as mset, but takes the dict of metastate parameters directly (no kwargs unpacking).
+
+        Parameter
+        ---------
+        metaset : dict
+            Keys/values as for the mset kwargs.  It is not modified.
 
-        if not len(kwargs):
+        """
+        if not len(metaset):
             return
         # Apply package
-        if 'package' in kwargs:
-            setargs = self.apply_package(kwargs['package'])
-            del kwargs['package']
+        if 'package' in metaset:
+            setargs = self.apply_package(metaset['package'])
+            setargs.update(metaset)  #T This is the new version of kwargs with package info ('package' itself is skipped)
         else:
-            setargs = {}
-        setargs.update(kwargs)  #T This is the new version of kwargs with package info
+            setargs = metaset  # Only read below, so no need to copy
 
         # Process verbose
         if 'verbose' in setargs:  # Used for below
             self.verbose = self._process_meta_kwargs_('verbose', setargs['verbose'])
 
         # Process other meta parameters than
-        skip_these = ['package', 'verbose', 'state']
+        skip_these = self.mset_skip
+        attributes = self.__dict__  # The metastate parameters are plain instance attributes
+        process_meta_kwargs = self._process_meta_kwargs_
         for this_key, this_val in setargs.items():
             if this_key in skip_these:
                 continue
-            value = self._process_meta_kwargs_(this_key, this_val)
-            if isinstance(value, str) and value.startswith(sv_util.INVALID):
+            current_val = attributes.get(this_key, _NOT_SET)
+            if current_val is this_val or current_val == this_val:  # Already set, so nothing to check
+                continue
+            value = process_meta_kwargs(this_key, this_val)
+            if type(value) is sv_util.Invalid:
                 if self.verbose:
-                    print(self._svm_alert_(f"{value.split('|')[1]} not allowed metastate option"))
+                    print(self._svm_alert_(f"{value.message} not allowed metastate option"))
             else:
-                setattr(self, this_key, value)
+                attributes[this_key] = value
         
         # Process meta state
         if 'state' in setargs:
@@ -304,25 +343,37 @@ class Metastate:
             If True, will include the metastates.
 
         """
+        lines = []  # Collected and printed once at the end
         if show_full:
-            print("Internal state:  ")
+            lines.append("Internal state:  ")
             for k in self.parameters:
                 if k != 'state':
-                    print("\t{:12s}   {}".format(k, getattr(self, k)))
-        print("State variables:")
+                    lines.append("\t{:12s}   {}".format(k, getattr(self, k)))
+        lines.append("State variables:")
         table_data = []
         keys = ['state_name', 'state_value', 'state_type', 'state_description']
         hdr = [_x.split('_')[1].capitalize() for _x in keys]
+        widths = [len(_x) + 2 for _x in hdr]
         _l = int(max_entry_len / 2 - 2)
-        for k in self.state:
+        for entry in self.state.values():  # Truncate and get column widths in the one pass
             table_row = []
-            for sk in keys:
-                value = str(self.state[k][sk])
+            for i, sk in enumerate(keys):
+                value = entry[sk]
+                if type(value) is not str:
+                    value = str(value)
                 if len(value) > max_entry_len:
-                    value = '{}....{}'.format(value[:_l], value[-_l:])
+                    value = f"{value[:_l]}....{value[-_l:]}"
+                if len(value) > widths[i]:
+                    widths[i] = len(value)
                 table_row.append(value)
             table_data.append(table_row)
-        print(tabulate(table_data, headers=hdr), '\n')
+        fmt = '  '.join([f"{{:{_w}s}}" for _w in widths])
+        lines.append(fmt.format(*hdr).rstrip())
+        lines.append('  '.join(['-' * _w for _w in widths]))
+        for table_row in table_data:
+            lines.append(fmt.format(*table_row).rstrip())
+        lines[-1] += ' \n'
+        print('\n'.join(lines))
 
     def to_dict(self, update_meta=False):
         """
@@ -337,15 +388,20 @@ class Metastate:
         kwargs_par = {}
         if isinstance(update_meta, dict) and not len(update_meta):
             return kwargs_par # An empty dictionary is returned as a null update_state
-        for k in self.parameters:
-            current_entry = copy(getattr(self, k))
-            if not update_meta:
-                kwargs_par[k] = current_entry
-            elif k in update_meta:
-                new_entry = self._process_meta_kwargs_(k, update_meta[k])
-                if new_entry != sv_util.INVALID and new_entry != current_entry:
-                    kwargs_par.setdefault('old', {})
-                    kwargs_par.setdefault('new', {})
-                    kwargs_par['old'][k] = current_entry
-                    kwargs_par['new'][k] = new_entry
+        if not update_meta:
+            for k in self.parameters:
+                kwargs_par[k] = sv_util._shallow_copy_(getattr(self, k))
+            return kwargs_par
+        for k, v in update_meta.items():  # Only look at the parameters being updated
+            if k not in self.parameters:
+                continue
+            current_entry = getattr(self, k)
+            if v is current_entry or v == current_entry:  # Unchanged, so skip the validation
+                continue
+            new_entry = self._process_meta_kwargs_(k, v)
+            if type(new_entry) is not sv_util.Invalid and new_entry != current_entry:
+                kwargs_par.setdefault('old', {})
+                kwargs_par.setdefault('new', {})
+                kwargs_par['old'][k] = sv_util._shallow_copy_(current_entry)
+                kwargs_par['new'][k] = new_entry
         return kwargs_par
\ No newline at end of file
@@ -1,7 +1,25 @@
-from copy import copy
+import os
+import json
+from copy import copy, deepcopy
 from .state_variable_error import StateVariableError
 
-INVALID = '_x_iNvAlId_x_'
+TYPE_NAMES = {'str': str, 'int': int, 'float': float, 'complex': complex, 'tuple': tuple, 'list': list,
+              'set': set, 'dict': dict, 'bool': bool}
+IMMUTABLE_TYPES = {int, float, complex, str, bytes, bool, type(None), frozenset, type}
+_file_cache = {}
+
+class Invalid:
+    """Returned in place of a metastate value that is not valid (checked by type, not string parsing)."""
+    def __init__(self, message):
+        self.message = message
+
+def _yaml_load_(fp):
+    """yaml is only needed if yaml files are actually used, so import here."""
+    import yaml
+    return yaml.safe_load(fp)
+
+FILE_LOADERS = {'.json': json.load, '.yaml': _yaml_load_, '.yml': _yaml_load_}
+FILE_SUFFIXES = tuple(FILE_LOADERS)
 
 def _dict_from_input_(inputv, list_key='state_name'):
     """Handle input to yield a dict -- inputv is either a dict or a filename:[key]."""
@@ -16,28 +34,74 @@ def _dict_from_input_(inputv, list_key='state_name'):
         return return_dict
     # Assume is string containing input filename
     ivsplit = inputv.split(':')
-    filename = ivsplit[0]
-    if filename.lower().endswith('.json'):
-        import json
-        with open(filename, 'r') as fp:
-            readfile = json.load(fp)
-    elif filename.lower().endswith('.yaml') or filename.lower().endswith('.yml'):
-        import yaml
-        with open(filename, 'r') as fp:
-            readfile = yaml.safe_load(fp)
+    readfile = _read_file_(ivsplit[0])
+    # Return a copy, since callers update the dicts and the cached version must stay as read.
     if len(ivsplit) == 1:
-        return readfile
+        return _maybe_copy_(readfile)
     elif len(ivsplit) == 2:
-        return readfile[ivsplit[1]]
+        return _maybe_copy_(readfile[ivsplit[1]])
     elif len(ivsplit) == 3:
-        return readfile[ivsplit[1]][ivsplit[2]]
+        return _maybe_copy_(readfile[ivsplit[1]][ivsplit[2]])
     else:
         raise StateVariableError(f"Too mamy levels ({len(ivsplit)}) in state file.")
 
+def _read_file_(filename):
+    """Read a json/yaml file, caching the parsed contents by absolute path and modification time/size."""
+    loader = FILE_LOADERS.get(os.path.splitext(filename)[1].lower())
+    if loader is None:
+        raise StateVariableError(f"Unknown file type for {filename} - must be json/yaml/yml.")
+    abspath = os.path.abspath(filename)  # a relative name may point elsewhere after a chdir
+    stat = os.stat(abspath)
+    file_version = (stat.st_mtime_ns, stat.st_size)  # size too, in case of coarse mtime resolution
+    if abspath in _file_cache and _file_cache[abspath][0] == file_version:
+        return _file_cache[abspath][1]
+    with open(abspath, 'r') as fp:
+        readfile = loader(fp)
+    _file_cache[abspath] = (file_version, readfile)
+    return readfile
+
+def clear_file_cache():
+    """Empty the parsed file cache (e.g. if a state/package file has been edited)."""
+    _file_cache.clear()
+
+def _maybe_copy_(inputv, memo=None):
+    """Copy only if inputv could be mutated -- immutables returned as-is, plain containers rebuilt, else deepcopy."""
+    this_type = type(inputv)
+    if this_type in IMMUTABLE_TYPES:
+        return inputv
+    if memo is None:
+        memo = {}
+    # As for deepcopy, the memo keeps shared references shared and stops recursion on self-references
+    this_id = id(inputv)
+    if this_id in memo:
+        return memo[this_id]
+    if this_type is dict:
+        new_val = memo[this_id] = {}
+        for k, v in inputv.items():
+            new_val[k] = _maybe_copy_(v, memo)
+    elif this_type is list:
+        new_val = memo[this_id] = []
+        for v in inputv:
+            new_val.append(_maybe_copy_(v, memo))
+    elif this_type is tuple:
+        new_val = tuple([_maybe_copy_(v, memo) for v in inputv])
+        if this_id in memo:  # A self-reference (through a mutable item) already made the copy
+            return memo[this_id]
+        memo[this_id] = new_val
+    else:
+        new_val = deepcopy(inputv, memo)
+    return new_val
+
+def _shallow_copy_(inputv):
+    """Shallow copy, returning immutables as-is."""
+    if type(inputv) in IMMUTABLE_TYPES:
+        return inputv
+    return copy(inputv)
+
 def _bool_from_input_(inputv):
     """Produce a sensible bool."""
     if isinstance(inputv, bool):
-        return copy(inputv)
+        return inputv
     if isinstance(inputv, str):
         if inputv.lower()[0] in ['f', 'n', '0']:
             return False
@@ -49,12 +113,12 @@ def _bool_from_input_(inputv):
 def _type_from_input_(inputv, etval=None):
     """Produce an appropriate data type."""
     if isinstance(inputv, type):
-        return copy(inputv)
+        return inputv
     if inputv is None:
         return None
     if isinstance(inputv, str):
-        if inputv in ['str', 'int', 'float', 'complex', 'tuple', 'list', 'tuple', 'set', 'dict', 'bool']:
-            return eval(inputv)
+        if inputv in TYPE_NAMES:
+            return TYPE_NAMES[inputv]
         if inputv.lower() == 'none':
             return None
         if inputv.lower() == 'auto':